@@ -14,6 +14,10 @@ def add_numbers(a: float, b: float) -> float:
     Returns:
         float: Sum of the two numbers
     """
+    # Numbers parsed by the agent are already floats
+    if type(a) is float and type(b) is float:
+        return a + b
+    
     try:
         result = float(a) + float(b)
         return result
@@ -31,6 +35,9 @@ def multiply_numbers(a: float, b: float) -> float:
     Returns:
         float: Product of the two numbers
     """
+    if type(a) is float and type(b) is float:
+        return a * b
+    
     try:
         result = float(a) * float(b)
         return result
@@ -5,18 +5,32 @@ Main program that uses Gemini LLM + tools to break down and execute multi-step t
 
 import os
 import re
+import sys
+import asyncio
 import json
 import logging
+import logging.handlers
 import time
-from typing import List, Dict, Any, Tuple
-from datetime import datetime
+import functools
+import concurrent.futures
+from typing import List, Dict, Any, Tuple, Literal, Optional, Callable
+from datetime import datetime, timedelta
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import caching
 from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, ValidationError
 from colorama import init, Fore, Style
+from prompt_toolkit import PromptSession
+from prompt_toolkit.formatted_text import ANSI
+from prompt_toolkit.patch_stdout import patch_stdout
 
+import gemini_client
+from gemini_client import MODEL_NAME
 from calculator_tool import calculate
-from translator_tool import translate_to_german
+from translator_tool import translator
+from response_cache import ResponseCache, prompt_key
 
 # Initialize colorama for colored output
 init(autoreset=True)
@@ -24,60 +38,70 @@ init(autoreset=True)
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging. File records are buffered and written in batches (immediately
+# for errors) so the request path does not wait on disk writes.
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# basicConfig only formats the handlers passed to it, not the MemoryHandler's target
+_log_file_handler = logging.FileHandler('agent.log')
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('agent.log'),
+        logging.handlers.MemoryHandler(
+            capacity=100,
+            flushLevel=logging.ERROR,
+            target=_log_file_handler
+        ),
         logging.StreamHandler()
     ]
 )
 
-class AgenticAI:
-    """
-    Main Agentic AI class that orchestrates Gemini LLM-based task breakdown and execution
-    """
-    
-    def __init__(self):
-        """Initialize the agent with Gemini API key and tools"""
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Available action types
-        self.action_types = ['calculate', 'translate', 'translate_to', 'answer']
-        
-        # Initialize interaction counter
-        self.interaction_count = 0
+# Ask Gemini for a JSON plan matching the Plan schema. Set AGENT_STRUCTURED_OUTPUT=false
+# to fall back to the free-text "Step N: action: ..., content: ..." format.
+USE_STRUCTURED_OUTPUT = os.getenv("AGENT_STRUCTURED_OUTPUT", "true").lower() != "false"
+
+def _strip_schema_defaults(schema: Dict[str, Any]) -> None:
+    """Remove field defaults from a JSON schema; Gemini response schemas reject them"""
+    for field_schema in schema.get('properties', {}).values():
+        field_schema.pop('default', None)
+
+class Step(BaseModel):
+    """A single step of the plan produced by the LLM"""
+    model_config = ConfigDict(json_schema_extra=_strip_schema_defaults)
     
-    def create_step_breakdown_prompt(self, user_input: str) -> str:
-        """
-        Create a prompt that instructs the LLM to break down the input into steps.
-        
-        Args:
-            user_input (str): The user's natural language input
-            
-        Returns:
-            str: Formatted prompt for the LLM
-        """
-        return f"""You are an AI task planner. Your job is to break down the user's request into specific steps that can be executed by different tools.
+    action: Literal['calculate', 'translate', 'translate_to', 'answer']
+    content: str
+    # Answer or translation filled in by the planner itself; always None for calculate
+    precomputed_result: Optional[str] = None
 
-IMPORTANT: You should NOT execute the steps yourself. Only classify and break down the tasks.
+class Plan(BaseModel):
+    """Structured breakdown of the user's request"""
+    steps: List[Step]
+
+# Static breakdown instructions. This prefix is identical for every request,
+# so it is cached server-side and only the user input is sent per call.
+BREAKDOWN_INSTRUCTIONS = """You are an AI task planner. Your job is to break down the user's request into specific steps that can be executed by different tools.
 
 Available action types:
-- calculate: For mathematical operations (addition, multiplication)
-- translate: For translating English phrases to German
-- translate_to: For translating phrases to a specific language (e.g., "Hello" to "Hola")
+- calculate: For mathematical operations (addition, multiplication), e.g. "add 5 and 3"
+- translate: For translating English phrases to German, e.g. "hello"
+- translate_to: For translating phrases to a specific language, written as "<text> to <language>" (e.g., "Hello to Spanish")
 - answer: For direct question answering that doesn't require tools
+"""
 
-User input: "{user_input}"
+# With structured output the planner answers and translates in the same call,
+# so only calculations are dispatched to a tool afterwards
+STRUCTURED_OUTPUT_INSTRUCTIONS = """
+For answer, translate and translate_to steps, put the final answer or translation in precomputed_result.
+IMPORTANT: Never compute calculate steps yourself. Leave precomputed_result null for them.
+"""
 
-Break this down into steps using the following format:
+# Output format for the free-text fallback; structured output makes it unnecessary
+STEP_FORMAT_EXAMPLES = """
+IMPORTANT: You should NOT execute the steps yourself. Only classify and break down the tasks.
+
+Break the user's request down into steps using the following format:
 Step 1: action: <action_type>, content: <task or content>
 Step 2: action: <action_type>, content: <task or content>
 ...
@@ -100,13 +124,294 @@ Examples:
 - For "Translate 'Hello' to Spanish and add 5 and 3":
   Step 1: action: translate_to, content: Hello to Spanish
   Step 2: action: calculate, content: add 5 and 3
+"""
+
+if USE_STRUCTURED_OUTPUT:
+    BREAKDOWN_SYSTEM_INSTRUCTION = BREAKDOWN_INSTRUCTIONS + STRUCTURED_OUTPUT_INSTRUCTIONS
+else:
+    BREAKDOWN_SYSTEM_INSTRUCTION = BREAKDOWN_INSTRUCTIONS + STEP_FORMAT_EXAMPLES
+
+# Explicit caching requires a versioned model name
+BREAKDOWN_CACHE_MODEL = 'models/gemini-1.5-flash-001'
+BREAKDOWN_CACHE_TTL = timedelta(minutes=10)
+# Smallest prompt the provider will cache, and a rough characters-per-token ratio
+# used to check the instructions against it without a network call. The current
+# instructions are far below this minimum, so caching stays off (and breakdowns use
+# breakdown_model) until they grow past it.
+BREAKDOWN_CACHE_MIN_TOKENS = 32768
+_CHARS_PER_TOKEN = 4
+
+# Patterns and keywords used to parse steps and calculations
+_STEP_RE = re.compile(r'Step \d+: action: (\w+), content: (.+)')
+_NUM_RE = re.compile(r'\d+')
+_ADD_KW = frozenset({'add', 'addition', '+'})
+_MUL_KW = frozenset({'multiply', 'multiplication', '*'})
+_CALCULATION_LABELS = {'add': 'Addition', 'multiply': 'Multiplication'}
+
+# Patterns for inputs simple enough to break down without the LLM
+_LOCAL_CALC_RE = re.compile(r'(?i)\b(add|multiply)\s+(\d+)\s+and\s+(\d+)\b')
+_LOCAL_TRANSLATE_RE = re.compile(r"(?i)translate\s+['\"]([^'\"]+)['\"]\s+(?:to|into)\s+(\w+)")
+# Start of the steps array in a streamed structured plan
+_STEPS_ARRAY_RE = re.compile(r'"steps"\s*:\s*\[')
 
-Please break down the user's request into steps:"""
+# Connectives that may remain between locally parsed steps
+_LOCAL_FILLER_RE = re.compile(r'(?i)\b(?:and|then|also|please)\b|[\s,.;!]+')
+
+# Maximum number of steps executed concurrently
+MAX_CONCURRENT_STEPS = 5
+
+# A step whose content refers back to an earlier result waits for all previous steps
+_DEPENDENCY_RE = re.compile(r'\b(?:previous (?:step|result)|the result|above result|step \d+)\b', re.IGNORECASE)
+
+# Answers for longer questions are not cached to keep memory bounded
+MAX_CACHEABLE_ANSWER_CHARS = 1000
+
+class _IncrementalStepParser:
+    """
+    Extracts complete steps from a breakdown response while it is still streaming
+    """
+    
+    def __init__(self, agent: 'AgenticAI'):
+        self.agent = agent
+        self.buffer = ''
+        self.position = 0
+        self.in_steps = False
+        self._decoder = json.JSONDecoder()
+    
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        """
+        Add a chunk of response text.
+        
+        Args:
+            text (str): Next chunk of the streamed response
+            
+        Returns:
+            List[Dict[str, str]]: Steps completed by this chunk
+        """
+        self.buffer += text
+        if USE_STRUCTURED_OUTPUT:
+            return self._feed_json()
+        return self._feed_lines()
+    
+    def _feed_lines(self) -> List[Dict[str, str]]:
+        """Parse the newly completed "Step N: ..." lines"""
+        end = self.buffer.rfind('\n')
+        if end < self.position:
+            return []
+        lines = self.buffer[self.position:end]
+        self.position = end + 1
+        return self.agent._parse_step_lines(lines)
+    
+    def _feed_json(self) -> List[Dict[str, str]]:
+        """Decode the newly completed objects of the plan's "steps" array"""
+        steps = []
+        if not self.in_steps:
+            match = _STEPS_ARRAY_RE.search(self.buffer)
+            if not match:
+                return steps
+            self.position = match.end()
+            self.in_steps = True
+        
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n,':
+                self.position += 1
+            if self.position >= len(self.buffer) or self.buffer[self.position] == ']':
+                return steps
+            try:
+                obj, self.position = self._decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                # The next step object is not complete yet
+                return steps
+            try:
+                steps.append(Step.model_validate(obj).model_dump())
+            except ValidationError as e:
+                logging.error(f"Invalid streamed step: {str(e)}")
+
+class AgenticAI:
+    """
+    Main Agentic AI class that orchestrates Gemini LLM-based task breakdown and execution
+    """
+    
+    def __init__(self):
+        """Initialize the agent with Gemini API key and tools"""
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY environment variable is required")
+        
+        # Configure Gemini (shared with the translator)
+        gemini_client.configure(self.api_key)
+        self.model = gemini_client.get_model()
+        
+        # Available action types
+        self.action_types = frozenset({'calculate', 'translate', 'translate_to', 'answer'})
+        
+        # Constrain the breakdown response to the Plan schema
+        if USE_STRUCTURED_OUTPUT:
+            self.breakdown_config = genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=Plan
+            )
+        else:
+            self.breakdown_config = None
+        
+        # Cache the static breakdown instructions so only the user input is sent per call.
+        # Without a cache they go in the model's system instruction, ahead of the user input.
+        self.cache = self._create_breakdown_cache()
+        self.breakdown_model = genai.GenerativeModel(MODEL_NAME, system_instruction=BREAKDOWN_SYSTEM_INSTRUCTION)
+        
+        # Client-side cache of breakdown and answer responses for repeated inputs
+        self.response_cache = ResponseCache()
+        
+        # Local parse statistics, logged to help tune the fast-path patterns
+        self._local_parse_attempts = 0
+        self._local_parse_hits = 0
+        
+        # Worker threads for synchronous tools used by the async pipeline
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        
+        # Event loop used to drive the async pipeline from synchronous callers
+        self._loop = asyncio.new_event_loop()
+        
+        # Initialize interaction counter
+        self.interaction_count = 0
+    
+    def _create_breakdown_cache(self):
+        """
+        Cache the static breakdown instructions server-side.
+        
+        Returns:
+            CachedContent: Handle to the cached instructions, or None if caching is unavailable
+        """
+        estimated_tokens = len(BREAKDOWN_SYSTEM_INSTRUCTION) // _CHARS_PER_TOKEN
+        if estimated_tokens < BREAKDOWN_CACHE_MIN_TOKENS:
+            logging.debug("Breakdown instructions too small to cache (~%d tokens)", estimated_tokens)
+            return None
+        
+        try:
+            return caching.CachedContent.create(
+                model=BREAKDOWN_CACHE_MODEL,
+                system_instruction=BREAKDOWN_SYSTEM_INSTRUCTION,
+                ttl=BREAKDOWN_CACHE_TTL
+            )
+        except Exception as e:
+            logging.warning(f"Context caching unavailable, sending full prompt: {str(e)}")
+            return None
+    
+    def create_step_breakdown_prompt(self, user_input: str) -> str:
+        """
+        Create the dynamic part of the breakdown prompt.
+        
+        The static instructions and examples live in BREAKDOWN_SYSTEM_INSTRUCTION,
+        so only the user input has to be sent with each request.
+        
+        Args:
+            user_input (str): The user's natural language input
+            
+        Returns:
+            str: Formatted prompt for the LLM
+        """
+        return f'User input: "{user_input}"\nBreak this down into steps:'
+
+    async def generate_breakdown_async(self, prompt: str, stream: bool = False):
+        """
+        Send a breakdown prompt to Gemini, using the cached instructions when available.
+        
+        Args:
+            prompt (str): Dynamic prompt from create_step_breakdown_prompt
+            stream (bool): Return the response as an async stream of chunks
+            
+        Returns:
+            AsyncGenerateContentResponse: Raw Gemini response
+        """
+        if self.cache is not None:
+            try:
+                model = genai.GenerativeModel.from_cached_content(cached_content=self.cache)
+                return await model.generate_content_async(prompt, generation_config=self.breakdown_config,
+                                                          stream=stream)
+            except (google_exceptions.NotFound, google_exceptions.PermissionDenied):
+                # The cache expired server-side (reported as 404 or 403); recreate it lazily and retry
+                logging.info("Breakdown cache expired, recreating it")
+                self.cache = self._create_breakdown_cache()
+                if self.cache is not None:
+                    model = genai.GenerativeModel.from_cached_content(cached_content=self.cache)
+                    return await model.generate_content_async(prompt, generation_config=self.breakdown_config,
+                                                              stream=stream)
+        
+        return await self.breakdown_model.generate_content_async(prompt, generation_config=self.breakdown_config,
+                                                                 stream=stream)
+
+    def _try_local_parse(self, user_input: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Break down simple inputs locally, skipping the LLM breakdown call.
+        
+        Only succeeds when every part of the input is covered by a calculation or
+        quoted translation pattern, apart from connectives such as "and then".
+        
+        Args:
+            user_input (str): The user's natural language input
+            
+        Returns:
+            Optional[List[Dict[str, str]]]: Parsed steps, or None if the LLM is needed
+        """
+        self._local_parse_attempts += 1
+        
+        matches = []
+        for match in _LOCAL_CALC_RE.finditer(user_input):
+            operation, a, b = match.groups()
+            matches.append((match.span(), {
+                'action': 'calculate',
+                'content': f"{operation.lower()} {a} and {b}"
+            }))
+        for match in _LOCAL_TRANSLATE_RE.finditer(user_input):
+            text, language = match.groups()
+            matches.append((match.span(), {
+                'action': 'translate_to',
+                'content': f"{text} to {language.capitalize()}"
+            }))
+        
+        if not matches:
+            return None
+        
+        # Everything outside the matched spans must be filler
+        matches.sort(key=lambda m: m[0])
+        residue = []
+        position = 0
+        for (start, end), _ in matches:
+            if start < position:
+                return None
+            residue.append(user_input[position:start])
+            position = end
+        residue.append(user_input[position:])
+        if _LOCAL_FILLER_RE.sub('', ''.join(residue)):
+            return None
+        
+        self._local_parse_hits += 1
+        logging.info("Local parse hit rate: %d/%d", self._local_parse_hits, self._local_parse_attempts)
+        return [step for _, step in matches]
 
     def parse_llm_response(self, response: str) -> List[Dict[str, str]]:
         """
         Parse the LLM response to extract steps.
         
+        Args:
+            response (str): LLM response containing steps
+            
+        Returns:
+            List[Dict[str, str]]: List of parsed steps with action and content
+        """
+        if USE_STRUCTURED_OUTPUT:
+            try:
+                return [step.model_dump() for step in Plan.model_validate_json(response).steps]
+            except ValidationError as e:
+                logging.error(f"Invalid structured plan: {str(e)}")
+                return []
+        
+        return self._parse_step_lines(response)
+
+    def _parse_step_lines(self, response: str) -> List[Dict[str, str]]:
+        """
+        Parse "Step N: action: ..., content: ..." lines from a free-text response.
+        
         Args:
             response (str): LLM response containing steps
             
@@ -120,7 +425,7 @@ Please break down the user's request into steps:"""
             line = line.strip()
             if line.startswith('Step'):
                 # Extract step number, action, and content
-                match = re.match(r'Step \d+: action: (\w+), content: (.+)', line)
+                match = _STEP_RE.match(line)
                 if match:
                     action = match.group(1).lower()
                     content = match.group(2).strip()
@@ -133,10 +438,64 @@ Please break down the user's request into steps:"""
         
         return steps
 
+    def _first_two_numbers(self, content: str) -> Optional[Tuple[float, float]]:
+        """
+        Extract the first two numbers from calculation content.
+        
+        Args:
+            content (str): Calculation content (e.g., "add 5 and 3")
+            
+        Returns:
+            Optional[Tuple[float, float]]: The two numbers, or None if there are fewer than two
+        """
+        matches = _NUM_RE.finditer(content)
+        a = next(matches, None)
+        b = next(matches, None)
+        if a is None or b is None:
+            return None
+        return float(a.group()), float(b.group())
+
+    def _parse_calculation(self, content: str) -> Tuple[Optional[str], Optional[Tuple[float, float]], Optional[str]]:
+        """
+        Extract the operation and operands from calculation content.
+        
+        Args:
+            content (str): Calculation content (e.g., "add 5 and 3")
+            
+        Returns:
+            Tuple: Operation, the two operands, and an error message if the content is unusable
+        """
+        # Substring match, so "Addition:" and "adding" are recognized too
+        content_lower = content.lower()
+        
+        if any(keyword in content_lower for keyword in _ADD_KW):
+            operation = 'add'
+        elif any(keyword in content_lower for keyword in _MUL_KW):
+            operation = 'multiply'
+        else:
+            return None, None, f"Error: Unsupported calculation operation in '{content}'"
+        
+        numbers = self._first_two_numbers(content)
+        if not numbers:
+            return None, None, f"Error: Could not extract two numbers from '{content}'"
+        return operation, numbers, None
+
     def execute_calculation(self, content: str) -> str:
         """
         Execute a calculation step.
         
+        Args:
+            content (str): Calculation content (e.g., "add 5 and 3")
+            
+        Returns:
+            str: Result of the calculation
+        """
+        return self._loop.run_until_complete(self.execute_calculation_async(content))
+
+    async def execute_calculation_async(self, content: str) -> str:
+        """
+        Execute a calculation step on the agent's thread pool.
+        
         Args:
             content (str): Calculation content (e.g., "add 5 and 3")
             
@@ -144,33 +503,40 @@ Please break down the user's request into steps:"""
             str: Result of the calculation
         """
         try:
-            # Extract numbers and operation from content
-            content_lower = content.lower()
-            
-            if 'add' in content_lower or 'addition' in content_lower:
-                # Find numbers in the content
-                numbers = re.findall(r'\d+', content)
-                if len(numbers) >= 2:
-                    result = calculate('add', float(numbers[0]), float(numbers[1]))
-                    return f"Addition result: {result}"
-                else:
-                    return f"Error: Could not extract two numbers from '{content}'"
-            
-            elif 'multiply' in content_lower or 'multiplication' in content_lower:
-                # Find numbers in the content
-                numbers = re.findall(r'\d+', content)
-                if len(numbers) >= 2:
-                    result = calculate('multiply', float(numbers[0]), float(numbers[1]))
-                    return f"Multiplication result: {result}"
-                else:
-                    return f"Error: Could not extract two numbers from '{content}'"
+            operation, numbers, error = self._parse_calculation(content)
+            if error:
+                return error
             
-            else:
-                return f"Error: Unsupported calculation operation in '{content}'"
-                
+            # The calculator is synchronous, so keep it off the event loop
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, calculate, operation, *numbers)
+            return f"{_CALCULATION_LABELS[operation]} result: {result}"
         except Exception as e:
             return f"Error executing calculation '{content}': {str(e)}"
 
+    def _split_translation(self, content: str) -> Tuple[str, str]:
+        """
+        Split translation content into the text and its target language.
+        
+        Args:
+            content (str): Translation content (e.g., "hello" or "Hello to Japanese")
+            
+        Returns:
+            Tuple[str, str]: Text to translate and target language (German by default)
+        """
+        # Clean the content (remove quotes if present)
+        clean_content = content.strip().strip('"\'')
+        
+        # Check if this is a multi-language translation (contains "to [Language]")
+        if " to " in clean_content.lower():
+            # Split on the last " to " so the text itself may contain one
+            parts = clean_content.rsplit(" to ", 1)
+            if len(parts) == 2:
+                return parts[0].strip(), parts[1].strip()
+        
+        # Default to German translation (backward compatibility)
+        return clean_content, "German"
+
     def execute_translation(self, content: str) -> str:
         """
         Execute a translation step.
@@ -181,36 +547,22 @@ Please break down the user's request into steps:"""
         Returns:
             str: Translation result
         """
-        try:
-            # Clean the content (remove quotes if present)
-            clean_content = content.strip().strip('"\'')
-            
-            # Check if this is a multi-language translation (contains "to [Language]")
-            if " to " in clean_content.lower():
-                # Parse for multi-language translation
-                parts = clean_content.split(" to ")
-                if len(parts) == 2:
-                    text_to_translate = parts[0].strip()
-                    target_language = parts[1].strip()
-                    
-                    # Import the multi-language translator
-                    from translator_tool import translate_to_language
-                    result = translate_to_language(text_to_translate, target_language)
-                    
-                    # Get translation method for feedback
-                    from translator_tool import translator
-                    method = translator.get_translation_method()
-                    
-                    return f"Translation ({method}): {result}"
-            
-            # Default to German translation (backward compatibility)
-            result = translate_to_german(clean_content)
-            
-            # Get translation method for feedback
-            from translator_tool import translator
-            method = translator.get_translation_method()
+        return self._loop.run_until_complete(self.execute_translation_async(content))
+
+    async def execute_translation_async(self, content: str) -> str:
+        """
+        Execute a translation step without blocking the event loop.
+        
+        Args:
+            content (str): Translation content (e.g., "hello" or "Hello to Japanese")
             
-            return f"Translation ({method}): {result}"
+        Returns:
+            str: Translation result
+        """
+        try:
+            text_to_translate, target_language = self._split_translation(content)
+            result = await translator.translate_to_language_async(text_to_translate, target_language)
+            return translator.prefix_for(text_to_translate, target_language) + result
         except Exception as e:
             return f"Error executing translation '{content}': {str(e)}"
 
@@ -218,6 +570,18 @@ Please break down the user's request into steps:"""
         """
         Execute a direct answer step using the Gemini LLM.
         
+        Args:
+            content (str): Question content
+            
+        Returns:
+            str: LLM's answer
+        """
+        return self._loop.run_until_complete(self.execute_answer_async(content))
+
+    async def execute_answer_async(self, content: str) -> str:
+        """
+        Execute a direct answer step using the async Gemini API.
+        
         Args:
             content (str): Question content
             
@@ -225,15 +589,58 @@ Please break down the user's request into steps:"""
             str: LLM's answer
         """
         try:
-            response = self.model.generate_content(content)
-            return f"Answer: {response.text.strip()}"
+            cacheable = len(content) <= MAX_CACHEABLE_ANSWER_CHARS
+            key = prompt_key(MODEL_NAME, content)
+            answer = self.response_cache.get(key) if cacheable else None
+            if answer is None:
+                response = await self.model.generate_content_async(content)
+                answer = response.text.strip()
+                if cacheable:
+                    self.response_cache.set(key, answer)
+            return f"Answer: {answer}"
         except Exception as e:
             return f"Error getting answer for '{content}': {str(e)}"
 
+    def _precomputed_result(self, step: Dict[str, str]) -> Optional[str]:
+        """
+        Format the result the planner already produced for a step, if any.
+        
+        Calculations are always run locally, so their precomputed results are ignored.
+        
+        Args:
+            step (Dict[str, str]): Parsed step
+            
+        Returns:
+            Optional[str]: Formatted result, or None if the step still has to be executed
+        """
+        precomputed = step.get('precomputed_result')
+        if not precomputed:
+            return None
+        
+        action = step['action']
+        if action == 'answer':
+            return f"Answer: {precomputed.strip()}"
+        elif action in ('translate', 'translate_to'):
+            # The planner is a Gemini call, whatever method the translator itself uses
+            return translator.gemini_prefix + precomputed.strip()
+        return None
+
     def execute_step(self, step: Dict[str, str]) -> str:
         """
         Execute a single step based on its action type.
         
+        Args:
+            step (Dict[str, str]): Step with 'action' and 'content' keys
+            
+        Returns:
+            str: Result of the step execution
+        """
+        return self._loop.run_until_complete(self.execute_step_async(step))
+
+    async def execute_step_async(self, step: Dict[str, str]) -> str:
+        """
+        Execute a single step without blocking the event loop.
+        
         Args:
             step (Dict[str, str]): Step with 'action' and 'content' keys
             
@@ -243,23 +650,205 @@ Please break down the user's request into steps:"""
         action = step['action']
         content = step['content']
         
+        precomputed = self._precomputed_result(step)
+        if precomputed is not None:
+            return precomputed
+        
         if action == 'calculate':
-            return self.execute_calculation(content)
-        elif action == 'translate':
-            return self.execute_translation(content)
-        elif action == 'translate_to':
-            return self.execute_translation(content) # Assuming translate_to is also a translation
+            return await self.execute_calculation_async(content)
+        elif action in ('translate', 'translate_to'):
+            return await self.execute_translation_async(content)
         elif action == 'answer':
-            return self.execute_answer(content)
+            return await self.execute_answer_async(content)
         else:
             return f"Error: Unknown action type '{action}'"
 
-    def process_user_input(self, user_input: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    async def _run_step(self, step: Dict[str, str], prerequisites: List[asyncio.Task],
+                        semaphore: asyncio.Semaphore) -> str:
+        """Wait for the step's prerequisites, then execute it under the concurrency limit"""
+        if prerequisites:
+            await asyncio.wait(prerequisites)
+        async with semaphore:
+            return await self.execute_step_async(step)
+
+    async def execute_steps_async(self, steps: List[Dict[str, str]],
+                                  on_result: Optional[Callable[[str], None]] = None) -> List[str]:
+        """
+        Execute steps concurrently.
+        
+        Steps are independent unless a step's content refers to an earlier result,
+        in which case it waits for all previous steps to finish first. Consecutive
+        translation steps are sent to Gemini as a single batch.
+        
+        Args:
+            steps (List[Dict[str, str]]): Parsed steps
+            on_result (Callable[[str], None]): Called with each formatted step result as it completes
+            
+        Returns:
+            List[str]: Step results, in step order
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_STEPS)
+        tasks = []
+        batch_tasks = []
+        try:
+            self._schedule_steps(steps, tasks, batch_tasks, semaphore, on_result)
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            await self._cancel_tasks(tasks + batch_tasks)
+            raise
+
+    async def _cancel_tasks(self, tasks: List[asyncio.Task]) -> None:
+        """Cancel tasks and wait for them to finish so none are left pending"""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _format_step_result(self, number: int, step: Dict[str, str], result: str) -> str:
+        """Format a step result for display"""
+        return f"Step {number} ({step['action']}): {result}"
+
+    def _schedule_steps(self, steps: List[Dict[str, str]], tasks: List[asyncio.Task],
+                        batch_tasks: List[asyncio.Task], semaphore: asyncio.Semaphore,
+                        on_result: Optional[Callable[[str], None]] = None) -> None:
+        """Schedule steps in order, batching runs of consecutive translations"""
+        first = len(tasks)
+        self._schedule_step_tasks(steps, tasks, batch_tasks, semaphore)
+        
+        if on_result is not None:
+            # tasks holds exactly one task per step, in step order
+            for number, (task, step) in enumerate(zip(tasks[first:], steps), first + 1):
+                task.add_done_callback(functools.partial(self._report_step_result, number, step, on_result))
+
+    def _report_step_result(self, number: int, step: Dict[str, str], on_result: Callable[[str], None],
+                            task: asyncio.Task) -> None:
+        """Pass a finished step's formatted result to on_result"""
+        if not task.cancelled() and task.exception() is None:
+            on_result(self._format_step_result(number, step, task.result()))
+
+    def _schedule_step_tasks(self, steps: List[Dict[str, str]], tasks: List[asyncio.Task],
+                             batch_tasks: List[asyncio.Task], semaphore: asyncio.Semaphore) -> None:
+        """Create the tasks for steps, batching runs of consecutive translations"""
+        batch = []
+        for step in steps:
+            if self._is_batchable_translation(step):
+                batch.append(step)
+                continue
+            self._schedule_translation_batch(batch, tasks, batch_tasks, semaphore)
+            batch = []
+            self._schedule_step(step, tasks, semaphore)
+        self._schedule_translation_batch(batch, tasks, batch_tasks, semaphore)
+
+    def _is_batchable_translation(self, step: Dict[str, str]) -> bool:
+        """Check whether a step is a translation that still needs a Gemini call"""
+        return (step['action'] in ('translate', 'translate_to')
+                and self._precomputed_result(step) is None
+                and not _DEPENDENCY_RE.search(step['content']))
+
+    def _schedule_translation_batch(self, batch: List[Dict[str, str]], tasks: List[asyncio.Task],
+                                    batch_tasks: List[asyncio.Task], semaphore: asyncio.Semaphore) -> None:
+        """
+        Start one task translating the whole batch, plus a task per step picking out its result.
+        
+        The batch task goes into batch_tasks rather than tasks, which holds one task per step,
+        so the caller can still cancel it.
+        """
+        if len(batch) < 2:
+            for step in batch:
+                self._schedule_step(step, tasks, semaphore)
+            return
+        
+        batch_task = asyncio.create_task(self._run_translation_batch(batch, semaphore))
+        batch_tasks.append(batch_task)
+        for index in range(len(batch)):
+            tasks.append(asyncio.create_task(self._batch_result(batch_task, index)))
+
+    async def _run_translation_batch(self, batch: List[Dict[str, str]], semaphore: asyncio.Semaphore) -> List[str]:
+        """Translate a batch of translation steps with a single Gemini call"""
+        async with semaphore:
+            try:
+                pairs = [self._split_translation(step['content']) for step in batch]
+                translations = await translator.translate_batch_async(pairs)
+                return [translator.prefix_for(text, language) + translation
+                        for (text, language), translation in zip(pairs, translations)]
+            except Exception as e:
+                return [f"Error executing translation '{step['content']}': {str(e)}" for step in batch]
+
+    async def _batch_result(self, batch_task: asyncio.Task, index: int) -> str:
+        """Result of a single step within a translation batch"""
+        return (await batch_task)[index]
+
+    def _schedule_step(self, step: Dict[str, str], tasks: List[asyncio.Task],
+                       semaphore: asyncio.Semaphore) -> None:
+        """Start a task for the step, depending on all earlier tasks if it refers to their results"""
+        prerequisites = list(tasks) if _DEPENDENCY_RE.search(step['content']) else []
+        tasks.append(asyncio.create_task(self._run_step(step, prerequisites, semaphore)))
+
+    async def _stream_breakdown_and_execute(self, prompt: str, key: tuple,
+                                            on_result: Optional[Callable[[str], None]] = None
+                                            ) -> Tuple[List[Dict[str, str]], List[str]]:
+        """
+        Stream the LLM breakdown and start executing each step as soon as it is complete.
+        
+        A trailing run of translation steps is held back until a different step arrives
+        or the stream ends, so consecutive translations can still be batched.
+        
+        Args:
+            prompt (str): Dynamic prompt from create_step_breakdown_prompt
+            key (tuple): Response cache key for the breakdown
+            on_result (Callable[[str], None]): Called with each formatted step result as it completes
+            
+        Returns:
+            Tuple[List[Dict[str, str]], List[str]]: Steps and their raw results
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_STEPS)
+        tasks = []
+        batch_tasks = []
+        steps = []
+        pending = []
+        parser = _IncrementalStepParser(self)
+        
+        try:
+            response = await self.generate_breakdown_async(prompt, stream=True)
+            async for chunk in response:
+                pending.extend(parser.feed(chunk.text if chunk.parts else ''))
+                
+                # A trailing translation may still be joined by the next one in the batch
+                ready = len(pending)
+                while ready and self._is_batchable_translation(pending[ready - 1]):
+                    ready -= 1
+                
+                steps.extend(pending[:ready])
+                self._schedule_steps(pending[:ready], tasks, batch_tasks, semaphore, on_result)
+                pending = pending[ready:]
+                # Let the newly scheduled steps start before reading the next chunk
+                await asyncio.sleep(0)
+            
+            llm_response = parser.buffer.strip()
+            logging.debug("LLM breakdown response: %s", llm_response)
+            
+            # The complete response is authoritative; schedule anything the incremental parse missed
+            parsed_steps = self.parse_llm_response(llm_response)
+            if parsed_steps:
+                # Only cache responses that parse, so a bad response is not replayed on retry
+                self.response_cache.set(key, llm_response)
+            remaining_steps = pending + parsed_steps[len(steps) + len(pending):]
+            steps.extend(remaining_steps)
+            self._schedule_steps(remaining_steps, tasks, batch_tasks, semaphore, on_result)
+            
+            return steps, await asyncio.gather(*tasks)
+        except BaseException:
+            await self._cancel_tasks(tasks + batch_tasks)
+            raise
+
+    async def process_user_input_async(self, user_input: str,
+                                       on_result: Optional[Callable[[str], None]] = None
+                                       ) -> Tuple[List[Dict[str, str]], List[str]]:
         """
         Process user input through the complete agentic pipeline.
         
         Args:
             user_input (str): User's natural language input
+            on_result (Callable[[str], None]): Called with each formatted step result as it completes
             
         Returns:
             Tuple[List[Dict[str, str]], List[str]]: Steps and results
@@ -269,31 +858,40 @@ Please break down the user's request into steps:"""
         tokens_used = 0
         
         try:
-            # Step 1: Use LLM to break down the input into steps
-            prompt = self.create_step_breakdown_prompt(user_input)
+            logging.info("Breaking down user input: %s", user_input)
             
-            logging.info(f"Breaking down user input: {user_input}")
+            # Step 1: Simple inputs are broken down locally without an LLM call
+            steps = self._try_local_parse(user_input)
+            step_results = None
             
-            response = self.model.generate_content(prompt)
-            api_calls += 1
-            llm_response = response.text.strip()
-            
-            logging.info(f"LLM breakdown response: {llm_response}")
+            if steps is None:
+                # Step 1b: Use LLM to break down the input into steps
+                prompt = self.create_step_breakdown_prompt(user_input)
+                
+                key = prompt_key(MODEL_NAME, prompt)
+                llm_response = self.response_cache.get(key)
+                if llm_response is None:
+                    # Steps start executing while the rest of the breakdown is still generated
+                    steps, step_results = await self._stream_breakdown_and_execute(prompt, key, on_result)
+                    api_calls += 1
+                else:
+                    # Step 2: Parse the LLM response to extract steps
+                    steps = self.parse_llm_response(llm_response)
             
-            # Step 2: Parse the LLM response to extract steps
-            steps = self.parse_llm_response(llm_response)
-            logging.info(f"Parsed {len(steps)} steps: {steps}")
+            logging.info("Parsed %d steps", len(steps))
+            logging.debug("Steps: %s", steps)
             
             if not steps:
                 return [], ["Error: Could not parse any steps from LLM response"]
             
-            # Step 3: Execute each step sequentially
-            results = []
-            for i, step in enumerate(steps, 1):
-                logging.info(f"Executing step {i}: {step}")
-                result = self.execute_step(step)
-                results.append(f"Step {i} ({step['action']}): {result}")
-                logging.info(f"Step {i} result: {result}")
+            # Step 3: Execute the steps concurrently
+            if step_results is None:
+                step_results = await self.execute_steps_async(steps, on_result)
+            results = [self._format_step_result(i, step, result)
+                       for i, (step, result) in enumerate(zip(steps, step_results), 1)]
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                for i, result in enumerate(step_results, 1):
+                    logging.debug("Step %d result: %s", i, result)
             
             return steps, results
             
@@ -301,17 +899,77 @@ Please break down the user's request into steps:"""
             logging.error(f"Error processing user input: {str(e)}")
             return [], [f"Error: {str(e)}"]
 
+    def process_user_input(self, user_input: str) -> Tuple[List[Dict[str, str]], List[str]]:
+        """
+        Process user input through the complete agentic pipeline.
+        
+        Args:
+            user_input (str): User's natural language input
+            
+        Returns:
+            Tuple[List[Dict[str, str]], List[str]]: Steps and results
+        """
+        # Reuse one event loop: the async Gemini client stays bound to the loop it was created on
+        return self._loop.run_until_complete(self.process_user_input_async(user_input))
+
+    def clear_cache(self):
+        """Clear all cached breakdown, answer and translation responses"""
+        self.response_cache.clear()
+        translator.clear_cache()
+
     def run_interactive(self):
         """Run the agent in interactive CLI mode"""
+        # Same loop as process_user_input: the async Gemini client is bound to it
+        try:
+            self._loop.run_until_complete(self._run_interactive_async())
+        finally:
+            self._pool.shutdown()
+            self._loop.close()
+
+    async def _run_interactive_async(self):
+        """
+        Interactive loop that keeps accepting input while earlier requests are processed.
+        
+        Inputs are queued and processed in order by a background worker, which prints
+        each step result as soon as it completes.
+        """
         print(f"{Fore.CYAN}🤖 Agentic AI System - Interactive Mode{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Type 'quit' or 'exit' to stop the program{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Type 'help' to see example inputs{Style.RESET_ALL}\n")
         
+        session = PromptSession()
+        queue = asyncio.Queue()
+        worker = asyncio.create_task(self._process_input_queue(queue))
+        
+        try:
+            # Keep the prompt at the bottom while results are printed above it
+            with patch_stdout(raw=True):
+                # Console logs must go through the patched stream or they overwrite the prompt
+                console_handlers = [
+                    handler for handler in logging.getLogger().handlers
+                    if type(handler) is logging.StreamHandler
+                ]
+                original_streams = [handler.stream for handler in console_handlers]
+                for handler in console_handlers:
+                    handler.setStream(sys.stderr)
+                try:
+                    await self._prompt_loop(session, queue)
+                finally:
+                    for handler, stream in zip(console_handlers, original_streams):
+                        handler.setStream(stream)
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    async def _prompt_loop(self, session: PromptSession, queue: asyncio.Queue):
+        """Read inputs and queue them until the user quits"""
         while True:
             try:
-                user_input = input(f"{Fore.GREEN}You: {Style.RESET_ALL}").strip()
+                user_input = (await session.prompt_async(ANSI(f"{Fore.GREEN}You: {Style.RESET_ALL}"))).strip()
                 
                 if user_input.lower() in ['quit', 'exit', 'q']:
+                    # Finish any queued requests before leaving
+                    await queue.join()
                     print(f"{Fore.CYAN}Goodbye! 👋{Style.RESET_ALL}")
                     break
                 
@@ -322,25 +980,43 @@ Please break down the user's request into steps:"""
                 if not user_input:
                     continue
                 
-                # Process the input
-                steps, results = self.process_user_input(user_input)
+                await queue.put(user_input)
                 
-                # Display results
-                print(f"\n{Fore.BLUE}🤖 Agent Results:{Style.RESET_ALL}")
-                if results:
-                    for result in results:
-                        print(f"  {Fore.WHITE}• {result}{Style.RESET_ALL}")
-                else:
+            except (KeyboardInterrupt, EOFError):
+                print(f"\n{Fore.CYAN}Goodbye! 👋{Style.RESET_ALL}")
+                break
+            except Exception as e:
+                print(f"{Fore.RED}Error: {str(e)}{Style.RESET_ALL}")
+                logging.error(f"Interactive mode error: {str(e)}")
+
+    async def _process_input_queue(self, queue: asyncio.Queue):
+        """Process queued inputs one at a time, printing step results as they arrive"""
+        while True:
+            user_input = await queue.get()
+            try:
+                print(f"\n{Fore.BLUE}🤖 Agent Results ({user_input}):{Style.RESET_ALL}")
+                printed = set()
+                
+                def print_result(result: str):
+                    printed.add(result)
+                    print(f"  {Fore.WHITE}• {result}{Style.RESET_ALL}")
+                
+                steps, results = await self.process_user_input_async(user_input, on_result=print_result)
+                
+                # Errors are returned without going through the callback
+                for result in results:
+                    if result not in printed:
+                        print_result(result)
+                if not results:
                     print(f"  {Fore.RED}No results generated{Style.RESET_ALL}")
                 
                 print()  # Empty line for readability
                 
-            except KeyboardInterrupt:
-                print(f"\n{Fore.CYAN}Goodbye! 👋{Style.RESET_ALL}")
-                break
             except Exception as e:
                 print(f"{Fore.RED}Error: {str(e)}{Style.RESET_ALL}")
                 logging.error(f"Interactive mode error: {str(e)}")
+            finally:
+                queue.task_done()
 
     def show_help(self):
         """Show help with example inputs"""
@@ -0,0 +1,40 @@
+"""
+Gemini Client for Agentic AI System
+Configures the Gemini SDK once and shares a single model between the agent and its tools
+"""
+
+import google.generativeai as genai
+
+MODEL_NAME = 'gemini-1.5-flash'
+
+# Shared model instance. The SDK creates its client lazily on the first call, so the
+# underlying gRPC channel is opened once and reused by every caller.
+_MODEL = genai.GenerativeModel(MODEL_NAME)
+
+_configured_api_key = None
+
+
+def configure(api_key: str) -> None:
+    """
+    Configure the Gemini SDK, skipping the work if it is already set up for this key.
+
+    Args:
+        api_key (str): Gemini API key
+    """
+    global _configured_api_key
+
+    if api_key == _configured_api_key:
+        return
+
+    genai.configure(api_key=api_key, transport='grpc')
+    _configured_api_key = api_key
+
+
+def get_model() -> genai.GenerativeModel:
+    """
+    Get the shared Gemini model.
+
+    Returns:
+        genai.GenerativeModel: Model used for answers, translations and breakdowns
+    """
+    return _MODEL
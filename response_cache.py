@@ -0,0 +1,93 @@
+"""
+Response Cache for Agentic AI System
+Small in-memory LRU cache with expiry, used to skip repeated Gemini API calls
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+DEFAULT_MAXSIZE = 512
+DEFAULT_TTL_SECONDS = 10 * 60
+
+
+def prompt_key(model_name: str, prompt: str) -> tuple:
+    """
+    Build a cache key for a prompt sent to a given model.
+
+    Args:
+        model_name (str): Name of the model the prompt is sent to
+        prompt (str): Rendered prompt
+
+    Returns:
+        tuple: (model_name, sha256 hex digest of the prompt)
+    """
+    return (model_name, hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+
+
+class ResponseCache:
+    """
+    Least-recently-used cache whose entries expire after a fixed time-to-live
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept
+            ttl (float): Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expiry timestamp)
+
+    def _prune(self, now: float) -> None:
+        """Drop expired entries from the least recently used end"""
+        while self._entries:
+            _, expiry = next(iter(self._entries.values()))
+            if expiry > now:
+                break
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Any: Cached value, or None on a miss or expired entry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to cache
+        """
+        now = time.monotonic()
+        self._prune(now)
+        self._entries[key] = (value, now + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -4,12 +4,44 @@ Handles translations between English and multiple languages using Gemini API
 """
 
 import os
+import json
+import asyncio
+import functools
+from typing import List, Tuple
+
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+# orjson parses the batch responses faster when it is installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+import gemini_client
+from response_cache import ResponseCache
+
 # Load environment variables
 load_dotenv()
 
+# Common phrases answered without an API call, keyed by (lowercase text, lowercase language)
+_STATIC_TRANSLATIONS = {
+    ("good morning", "german"): "Guten Morgen",
+    ("hello", "german"): "Hallo",
+    ("thank you", "german"): "Danke",
+    ("good morning", "spanish"): "Buenos días",
+    ("hello", "spanish"): "Hola",
+    ("thank you", "spanish"): "Gracias",
+    ("good morning", "french"): "Bonjour",
+    ("hello", "french"): "Bonjour",
+    ("thank you", "french"): "Merci",
+    ("good morning", "japanese"): "おはようございます",
+    ("hello", "japanese"): "こんにちは",
+    ("thank you", "japanese"): "ありがとうございます",
+}
+
+SUPPORTED_LANGUAGES = ("German", "Japanese", "Spanish", "French", "Italian", "Portuguese", "Russian", "Chinese", "Korean", "Arabic")
 
 
 class MultiLanguageTranslator:
@@ -23,10 +55,19 @@ class MultiLanguageTranslator:
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.use_gemini = False
         
+        # Cache of (text, target_language) -> translation
+        self.response_cache = ResponseCache()
+        
+        # Batched translations come back as a JSON array of strings
+        self.batch_config = genai.GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=list[str]
+        )
+        
         if self.api_key:
             try:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                gemini_client.configure(self.api_key)
+                self.model = gemini_client.get_model()
                 self.use_gemini = True
                 print("✅ Multi-language Gemini translator initialized successfully")
             except Exception as e:
@@ -34,6 +75,12 @@ class MultiLanguageTranslator:
                 print("📚 Falling back to static dictionary")
         else:
             print("📚 Using static dictionary (no API key found)")
+        
+        # Translation method and the result prefix reported by the agent
+        self.method = "Gemini API" if self.use_gemini else "Static Dictionary"
+        self.gemini_prefix = "Translation (Gemini API): "
+        self.static_prefix = "Translation (Static Dictionary): "
+        self.prefix = self.gemini_prefix if self.use_gemini else self.static_prefix
     
     def translate_with_gemini(self, text: str, target_language: str) -> str:
         """
@@ -47,24 +94,53 @@ class MultiLanguageTranslator:
             str: Translation
         """
         try:
-            prompt = f"""Translate the following English text to {target_language}. 
-            Provide only the {target_language} translation, nothing else.
-            
-            English: "{text}"
-            {target_language}:"""
-            
-            response = self.model.generate_content(prompt)
-            translation = response.text.strip()
-            
-            # Clean up the response (remove quotes if present)
-            translation = translation.strip('"\'')
-            
-            return translation
+            response = self.model.generate_content(self._build_prompt(text, target_language))
+            return self._store_translation((text, target_language), response)
+        except Exception as e:
+            print(f"⚠  Gemini translation failed: {e}")
+            return None
+    
+    async def translate_with_gemini_async(self, text: str, target_language: str) -> str:
+        """
+        Translate text to target language using the async Gemini API
+        
+        Args:
+            text (str): Text to translate
+            target_language (str): Target language (e.g., "German", "Japanese", "Spanish")
             
+        Returns:
+            str: Translation
+        """
+        try:
+            response = await self.model.generate_content_async(self._build_prompt(text, target_language))
+            return self._store_translation((text, target_language), response)
         except Exception as e:
             print(f"⚠  Gemini translation failed: {e}")
             return None
     
+    def _build_prompt(self, text: str, target_language: str) -> str:
+        """Build the Gemini translation prompt"""
+        return f"""Translate the following English text to {target_language}. 
+            Provide only the {target_language} translation, nothing else.
+            
+            English: "{text}"
+            {target_language}:"""
+    
+    def _store_translation(self, key: tuple, response) -> str:
+        """Clean up a Gemini translation response and cache it"""
+        translation = response.text.strip()
+        
+        # Clean up the response (remove quotes if present)
+        translation = translation.strip('"\'')
+        
+        if translation:
+            self.response_cache.set(key, translation)
+        return translation
+    
+    def _known_translation(self, text: str, target_language: str):
+        """Get a translation from the static dictionary or the cache, or None if Gemini is needed"""
+        return self.lookup_static(text, target_language) or self.response_cache.get((text, target_language))
+    
     def translate_to_language(self, english_text: str, target_language: str = "German") -> str:
         """
         Translate English text to target language using Gemini API
@@ -82,6 +158,10 @@ class MultiLanguageTranslator:
         # Clean and normalize the input
         cleaned_text = english_text.strip()
         
+        known_translation = self._known_translation(cleaned_text, target_language)
+        if known_translation:
+            return known_translation
+        
         # Use Gemini API for translation
         if self.use_gemini:
             gemini_translation = self.translate_with_gemini(cleaned_text, target_language)
@@ -91,53 +171,91 @@ class MultiLanguageTranslator:
         # If Gemini API is not available, return error message
         return f"Translation failed: Gemini API not available"
     
-    def translate_to_german(self, english_text: str) -> str:
+    async def translate_to_language_async(self, english_text: str, target_language: str = "German") -> str:
         """
-        Translate English text to German (backward compatibility)
+        Translate English text to target language without blocking the event loop
         
         Args:
             english_text (str): English text to translate
+            target_language (str): Target language (default: German)
             
         Returns:
-            str: German translation
+            str: Translation
         """
-        return self.translate_to_language(english_text, "German")
+        if not english_text:
+            return ""
+        
+        cleaned_text = english_text.strip()
+        
+        known_translation = self._known_translation(cleaned_text, target_language)
+        if known_translation:
+            return known_translation
+        
+        if self.use_gemini:
+            gemini_translation = await self.translate_with_gemini_async(cleaned_text, target_language)
+            if gemini_translation:
+                return gemini_translation
+        
+        return f"Translation failed: Gemini API not available"
     
-    def translate_to_japanese(self, english_text: str) -> str:
+    async def translate_batch_async(self, pairs: List[Tuple[str, str]]) -> List[str]:
         """
-        Translate English text to Japanese
+        Translate several texts with a single async Gemini call
         
         Args:
-            english_text (str): English text to translate
+            pairs (List[Tuple[str, str]]): (English text, target language) pairs
             
         Returns:
-            str: Japanese translation
+            List[str]: Translations, in input order
         """
-        return self.translate_to_language(english_text, "Japanese")
-    
-    def translate_to_spanish(self, english_text: str) -> str:
-        """
-        Translate English text to Spanish
+        pairs, results, missing = self._lookup_batch(pairs)
         
-        Args:
-            english_text (str): English text to translate
+        if missing and self.use_gemini:
+            try:
+                response = await self.model.generate_content_async(self._build_batch_prompt(pairs, missing),
+                                                                   generation_config=self.batch_config)
+                self._store_batch(pairs, results, missing, response)
+            except Exception as e:
+                print(f"⚠  Gemini batch translation failed: {e}")
+        
+        # Translate anything the batch could not provide concurrently, one call per item
+        unresolved = [i for i, result in enumerate(results) if result is None]
+        fallbacks = await asyncio.gather(*(self.translate_to_language_async(*pairs[i]) for i in unresolved))
+        for i, translation in zip(unresolved, fallbacks):
+            results[i] = translation
+        return results
+    
+    def _lookup_batch(self, pairs: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], list, List[int]]:
+        """Normalize batch input and fill in known translations; returns pairs, results and missing indexes"""
+        pairs = [(text.strip(), language) for text, language in pairs]
+        results = [self._known_translation(text, language) if text else "" for text, language in pairs]
+        missing = [i for i, result in enumerate(results) if result is None]
+        return pairs, results, missing
+    
+    def _build_batch_prompt(self, pairs: List[Tuple[str, str]], missing: List[int]) -> str:
+        """Build the Gemini prompt for the uncached part of a batch"""
+        items = "\n".join(f'{n}. {pairs[i][1]}: "{pairs[i][0]}"' for n, i in enumerate(missing, 1))
+        return f"""Translate each of the following English texts to the language given before it.
+            Return a JSON array containing only the translations, in the same order.
             
-        Returns:
-            str: Spanish translation
-        """
-        return self.translate_to_language(english_text, "Spanish")
+{items}"""
     
-    def translate_to_french(self, english_text: str) -> str:
-        """
-        Translate English text to French
+    def _store_batch(self, pairs: List[Tuple[str, str]], results: list, missing: List[int], response) -> None:
+        """Place batch translations into results and cache them, ignoring malformed responses"""
+        translations = _json_loads(response.text)
+        if not isinstance(translations, list) or len(translations) != len(missing):
+            print("⚠  Gemini batch translation returned an unexpected number of results")
+            return
         
-        Args:
-            english_text (str): English text to translate
-            
-        Returns:
-            str: French translation
-        """
-        return self.translate_to_language(english_text, "French")
+        for i, translation in zip(missing, translations):
+            translation = str(translation).strip().strip('"\'')
+            if translation:
+                results[i] = translation
+                self.response_cache.set(pairs[i], translation)
+    
+    def clear_cache(self) -> None:
+        """Clear cached translations"""
+        self.response_cache.clear()
     
     def get_available_translations(self) -> list:
         """
@@ -158,6 +276,34 @@ class MultiLanguageTranslator:
         """
         print("⚠  Dictionary translations are deprecated. Using Gemini API for all translations.")
     
+    def lookup_static(self, english_text: str, target_language: str):
+        """
+        Look up a phrase in the static dictionary
+        
+        Args:
+            english_text (str): English text to translate
+            target_language (str): Target language
+            
+        Returns:
+            str: Translation, or None if the phrase is not in the dictionary
+        """
+        return _STATIC_TRANSLATIONS.get((english_text.strip().lower(), target_language.lower()))
+    
+    def prefix_for(self, english_text: str, target_language: str) -> str:
+        """
+        Get the result prefix naming the method that translates this text
+        
+        Args:
+            english_text (str): English text to translate
+            target_language (str): Target language
+            
+        Returns:
+            str: "Translation (<method>): "
+        """
+        if self.lookup_static(english_text, target_language):
+            return self.static_prefix
+        return self.prefix
+    
     def get_translation_method(self) -> str:
         """
         Get the current translation method being used
@@ -165,7 +311,7 @@ class MultiLanguageTranslator:
         Returns:
             str: "Gemini API" or "Static Dictionary"
         """
-        return "Gemini API" if self.use_gemini else "Static Dictionary"
+        return self.method
     
     def get_supported_languages(self) -> list:
         """
@@ -174,19 +320,21 @@ class MultiLanguageTranslator:
         Returns:
             list: List of supported languages
         """
-        return ["German", "Japanese", "Spanish", "French", "Italian", "Portuguese", "Russian", "Chinese", "Korean", "Arabic"]
+        return list(SUPPORTED_LANGUAGES)
+
+# Per-language shortcuts (translate_to_german, translate_to_japanese, ...) bound to translate_to_language
+for _language in SUPPORTED_LANGUAGES:
+    setattr(MultiLanguageTranslator, f"translate_to_{_language.lower()}",
+            functools.partialmethod(MultiLanguageTranslator.translate_to_language, target_language=_language))
+del _language
 
 # Global translator instance
 translator = MultiLanguageTranslator()
 
 # Convenience functions for backward compatibility
-def translate_to_german(english_text: str) -> str:
-    """Translate English text to German"""
-    return translator.translate_to_german(english_text)
+translate_to_german = functools.partial(translator.translate_to_language, target_language="German")
 
-def translate_to_japanese(english_text: str) -> str:
-    """Translate English text to Japanese"""
-    return translator.translate_to_japanese(english_text)
+translate_to_japanese = functools.partial(translator.translate_to_language, target_language="Japanese")
 
 def translate_to_language(english_text: str, target_language: str) -> str:
     """Translate English text to any supported language"""